@@ -1,36 +1,73 @@
 import os
 import sys
-import platform
+import atexit
+import contextlib
 import subprocess
 import json
+import logging
+import logging.handlers
+import hashlib
 import time
 import webbrowser
 import shutil
-import tempfile
 import threading
-import requests
-from pathlib import Path
+import queue
+import functools
+from concurrent.futures import ThreadPoolExecutor, wait
+from string import Template
 from datetime import datetime
 
 # PyQt导入
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QLabel, QProgressBar,
-                            QMessageBox, QWizard, QWizardPage, QTextEdit, 
+                            QMessageBox, QWizard, QWizardPage, QPlainTextEdit, 
                             QLineEdit, QFileDialog, QCheckBox, QGroupBox,
-                            QRadioButton, QTabWidget, QComboBox, QGridLayout,
-                            QSpacerItem, QSizePolicy, QSystemTrayIcon, QMenu,
-                            QAction, QStyle, QDialog, QTreeWidget, QTreeWidgetItem)
-from PyQt5.QtGui import QIcon, QPixmap, QFont, QTextCursor, QColor
-from PyQt5.QtCore import (Qt, QThread, pyqtSignal, QTimer, QUrl, QSize, 
-                         QObject, pyqtSlot, QProcess, QSettings, QDir)
+                            QTabWidget, QGridLayout, QSystemTrayIcon, QMenu,
+                            QAction, QStyle)
+from PyQt5.QtGui import QIcon, QFont, QTextCursor, QIntValidator
+from PyQt5.QtCore import (Qt, QThread, pyqtSignal, QTimer, QObject, QProcess,
+                         QThreadPool, QRunnable)
+
+# orjson为可选依赖，未安装时使用标准库json读写设置
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Docker SDK为可选依赖，未安装时使用docker命令行
+try:
+    import docker as docker_sdk
+except ImportError:
+    docker_sdk = None
+
+# pywin32仅用于创建开机自启动快捷方式，未安装时跳过
+try:
+    import pythoncom
+    import win32com.client
+except ImportError:
+    pythoncom = None
+    win32com = None
 
 
 # 应用程序常量
 APP_NAME = "OpenHands PC部署助手"
 APP_VERSION = "1.0.0"
 APP_AUTHOR = "Polly"
-CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".openhands-assistant")
+_HOME = os.path.expanduser("~")
+CONFIG_DIR = os.path.join(_HOME, ".openhands-assistant")
 LOG_FILE = os.path.join(CONFIG_DIR, "openhands-assistant.log")
+_SETTINGS_FILE = os.path.join(CONFIG_DIR, "settings.json")
+_WORKSPACE_DEFAULT = os.path.join(_HOME, "Docker_Workspace")
+_STATE_DEFAULT = os.path.join(_HOME, ".openhands-state")
+
+try:
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+except OSError as e:
+    print(f"创建配置目录失败: {e}")
+LOG_FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
 
 # Docker配置模板
 DOCKER_COMPOSE_TEMPLATE = '''
@@ -42,23 +79,153 @@ services:
       - SANDBOX_RUNTIME_CONTAINER_IMAGE=docker.all-hands.dev/all-hands-ai/runtime:0.27-nikolaik
       - LOG_ALL_EVENTS=true
       - SANDBOX_USER_ID="1000"
-      - WORKSPACE_MOUNT_PATH={workspace_path}
+      - WORKSPACE_MOUNT_PATH=$workspace_path
     volumes:
       - /var/run/docker.sock:/var/run/docker.sock
-      - {state_dir}:/.openhands-state
-      - {workspace_dir}:/opt/workspace_base
+      - $state_dir:/.openhands-state
+      - $workspace_dir:/opt/workspace_base
     ports:
-      - "{port}:3000"
+      - "$port:3000"
     extra_hosts:
       - "host.docker.internal:host-gateway"
     tty: true
     stdin_open: true
     restart: "no"
 '''
+# 模块加载时预编译模板
+_COMPOSE_TPL = Template(DOCKER_COMPOSE_TEMPLATE)
+
+# OpenHands容器名称，与模板中的container_name一致
+CONTAINER_NAME = "openhands-app"
+# 打开日志时显示的最近日志行数
+LOG_TAIL_LINES = 50
+# 日志窗口最多保留的行数，超出后丢弃最早的行
+LOG_MAX_BLOCKS = 2000
+
+# 容器状态缓存时间（秒）
+STATUS_CACHE_TTL = 1.0
+# 会改变容器运行状态的Docker事件
+CONTAINER_STATE_EVENTS = ["start", "stop", "die", "kill", "pause", "unpause", "destroy"]
+
+# Docker Compose V2命令（Go插件，启动比docker-compose V1快得多）
+DOCKER_COMPOSE_CMD = ["docker", "compose"]
 
 # Docker Desktop下载URL
 DOCKER_DESKTOP_DOWNLOAD_URL = "https://desktop.docker.com/win/main/amd64/Docker%20Desktop%20Installer.exe"
 
+# 缓存的Docker Desktop安装程序，重试时可断点续传
+DOCKER_INSTALLER_PATH = os.path.join(CONFIG_DIR, "DockerDesktopInstaller.exe")
+DOCKER_INSTALLER_META_FILE = DOCKER_INSTALLER_PATH + ".meta.json"
+# 安装程序的SHA-256；上面的下载地址总是指向最新版本，固定版本时在此填写校验值
+DOCKER_DESKTOP_SHA256 = ""
+
+# Docker Desktop要求的最低Windows build
+MIN_WINDOWS_BUILD = 19041
+
+# 下载数据块大小及进度回调的最小间隔（秒）
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# 下载线程与写入线程之间最多缓存的数据块数
+DOWNLOAD_QUEUE_SIZE = 16
+PROGRESS_UPDATE_INTERVAL = 0.05
+
+# 查询CPU虚拟化状态；Hyper-V运行时固件标志会显示为False，因此同时检查Hypervisor
+# CIM查询失败时输出$null而不是$false，以便调用方回退到其他检查方式
+VIRTUALIZATION_QUERY = (
+    "$($cpu = Get-CimInstance Win32_Processor; "
+    "if ($cpu) { (@($cpu.VirtualizationFirmwareEnabled) -contains $true) "
+    "-or (Get-CimInstance Win32_ComputerSystem).HypervisorPresent } else { $null })"
+)
+# IsProcessorFeaturePresent的虚拟化固件启用标志
+PF_VIRT_FIRMWARE_ENABLED = 21
+
+# 一次收集所有系统检查信息的PowerShell脚本，输出JSON
+BATCH_PROBE_SCRIPT = "; ".join([
+    "$ErrorActionPreference = 'SilentlyContinue'",
+    "$d = @{docker_version = ''; docker_server = ''; wsl = $false; virt = $null; disk = $null}",
+    "if (Get-Command docker) { "
+    "$d.docker_version = \"$(docker --version)\"; "
+    "$d.docker_server = \"$(docker version --format '{{json .Server}}' 2>$null)\" }",
+    "if (Get-Command wsl) { wsl --status *> $null; $d.wsl = ($LASTEXITCODE -eq 0) }",
+    "$d.virt = " + VIRTUALIZATION_QUERY,
+    "$d.disk = (Get-PSDrive C).Free",
+    "$d | ConvertTo-Json -Compress",
+])
+
+# 系统检查结果缓存时间（秒）
+PROBE_CACHE_TTL = 60
+# 批量检查超时时间（秒）；WSL异常时wsl --status可能一直不返回
+BATCH_PROBE_TIMEOUT = 15
+# Docker运行状态变化较快，使用较短的缓存时间
+DOCKER_RUNNING_CACHE_TTL = 2
+# 磁盘空间检查结果缓存时间（秒）
+DISK_SPACE_CACHE_TTL = 30
+
+# 目录选择对话框选项：只显示目录，不逐项查找自定义图标、不解析符号链接，网络驱动器上打开更快
+BROWSE_DIR_OPTIONS = (QFileDialog.ShowDirsOnly
+                      | QFileDialog.DontUseCustomDirectoryIcons
+                      | QFileDialog.DontResolveSymlinks)
+
+# 向导和关于页的富文本，模块加载时生成一次
+_INTRO_HTML = """
+<h3>欢迎使用 OpenHands PC 部署助手！</h3>
+<p>本向导将帮助您完成以下设置：</p>
+<ul>
+    <li>检查系统兼容性</li>
+    <li>安装 Docker Desktop（如果需要）</li>
+    <li>配置 OpenHands 运行环境</li>
+    <li>部署并启动 OpenHands</li>
+</ul>
+<p>点击"下一步"开始安装流程。</p>
+"""
+
+_COMPLETION_HTML = """
+<h3>恭喜！OpenHands设置已完成。</h3>
+<p>您已经成功完成了OpenHands的安装配置。接下来您可以：</p>
+<ul>
+    <li>启动OpenHands服务</li>
+    <li>使用Web浏览器访问OpenHands界面</li>
+    <li>通过系统托盘图标管理OpenHands</li>
+</ul>
+<p>点击"完成"按钮关闭向导并启动OpenHands管理器。</p>
+"""
+
+_ABOUT_HTML = f"""
+<h2>{APP_NAME} v{APP_VERSION}</h2>
+<p>开发者：{APP_AUTHOR}</p>
+<p>这是一个用于Windows平台的OpenHands部署助手，可以帮助您快速设置OpenHands运行环境。</p>
+<p>特性：</p>
+<ul>
+    <li>自动检查系统兼容性</li>
+    <li>安装配置Docker环境</li>
+    <li>管理OpenHands容器</li>
+    <li>提供简单易用的Web界面接入</li>
+</ul>
+"""
+
+@functools.lru_cache(maxsize=1)
+def _app_icon():
+    """加载同目录下的polly.ico，只读取和解码一次；找不到文件时返回空图标"""
+    logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "polly.ico")
+    if os.path.exists(logo_path):
+        return QIcon(logo_path)
+    return QIcon()
+
+@functools.lru_cache(maxsize=1)
+def _tray_icon():
+    """托盘和窗口使用的图标；找不到polly.ico时使用系统默认图标，只查询一次主题"""
+    icon = _app_icon()
+    if not icon.isNull():
+        return icon
+    return QApplication.style().standardIcon(QStyle.SP_ComputerIcon)
+
+@functools.lru_cache(maxsize=1)
+def _title_font():
+    """主窗口标题字体；QFont需要在QApplication创建后构造，因此延迟到首次使用"""
+    font = QFont()
+    font.setPointSize(16)
+    font.setBold(True)
+    return font
+
 # 在文件顶部添加这个类
 class SignalLabel(QLabel):
     textChanged = pyqtSignal(str)
@@ -71,33 +238,35 @@ class AppConfig:
     """应用程序配置管理类"""
     
     def __init__(self):
-        self.settings_file = os.path.join(CONFIG_DIR, "settings.json")
+        self.settings_file = _SETTINGS_FILE
         self.default_settings = {
-            "workspace_dir": os.path.join(os.path.expanduser("~"), "Docker_Workspace"),
-            "state_dir": os.path.join(os.path.expanduser("~"), ".openhands-state"),
+            "workspace_dir": _WORKSPACE_DEFAULT,
+            "state_dir": _STATE_DEFAULT,
             "port": "80",
             "auto_start": False,
             "minimize_to_tray": True,
             "check_update": True,
             "last_check": "",
         }
+        self._dirty = False
+        self._batch_depth = 0
         self.settings = self.load_settings()
+        # 进程退出时写回未保存的修改
+        atexit.register(self.flush)
         
     def load_settings(self):
         """加载应用设置"""
-        if not os.path.exists(CONFIG_DIR):
-            os.makedirs(CONFIG_DIR)
-            
         if os.path.exists(self.settings_file):
             try:
-                with open(self.settings_file, 'r') as f:
-                    return json.load(f)
+                with open(self.settings_file, 'rb') as f:
+                    data = f.read()
+                return orjson.loads(data) if orjson else json.loads(data)
             except Exception as e:
                 print(f"加载设置文件错误: {e}")
-                return self.default_settings
+                return dict(self.default_settings)
         else:
-            self.save_settings(self.default_settings)
-            return self.default_settings
+            self.save_settings(dict(self.default_settings))
+            return self.settings
             
     def save_settings(self, settings=None):
         """保存应用设置"""
@@ -105,8 +274,16 @@ class AppConfig:
             self.settings = settings
             
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=4)
+            if orjson:
+                data = orjson.dumps(self.settings, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(self.settings, indent=2, ensure_ascii=False).encode("utf-8")
+            # 先写临时文件再替换，避免写入中途崩溃损坏设置文件
+            tmp_file = self.settings_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.settings_file)
+            self._dirty = False
         except Exception as e:
             print(f"保存设置文件错误: {e}")
             
@@ -118,9 +295,41 @@ class AppConfig:
             return self.settings.get(key, default)
         
     def update_setting(self, key, value):
-        """更新指定设置项"""
+        """更新指定设置项（仅修改内存，调用flush()后写入磁盘）"""
         self.settings[key] = value
-        self.save_settings()
+        self._dirty = True
+        
+    def update_settings(self, settings):
+        """批量更新设置项，只写入一次磁盘（在batch()内时推迟到退出batch时写入）"""
+        self.settings.update(settings)
+        self._dirty = True
+        if not self._batch_depth:
+            self.flush()
+        
+    @contextlib.contextmanager
+    def batch(self):
+        """在with块内合并多次设置修改，退出时只写入一次磁盘"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+        
+    def flush(self):
+        """将未保存的修改写入磁盘"""
+        if self._dirty:
+            self.save_settings()
+
+_app_config = None
+
+def get_app_config():
+    """获取进程内唯一的AppConfig实例"""
+    global _app_config
+    if _app_config is None:
+        _app_config = AppConfig()
+    return _app_config
 
 class Logger:
     """日志记录类"""
@@ -128,23 +337,38 @@ class Logger:
     def __init__(self, log_file=LOG_FILE):
         self.log_file = log_file
         # 确保日志目录存在
-        log_dir = os.path.dirname(log_file)
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            
+        self._logger = logging.getLogger(f"{__name__}.{log_file}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        if not self._logger.handlers:
+            # 文件在首次写入时才打开，并按大小轮转
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8", delay=True
+            )
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+            # 在内存中缓冲日志，满256条或遇到ERROR及以上级别时再批量写入
+            self._handler = logging.handlers.MemoryHandler(
+                capacity=256, flushLevel=logging.ERROR, target=file_handler
+            )
+            self._logger.addHandler(self._handler)
+            atexit.register(self._handler.flush)
+        else:
+            self._handler = self._logger.handlers[0]
     
     def log(self, message, level="INFO"):
         """记录日志"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] [{level}] {message}\n"
-        
-        try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(log_entry)
-        except Exception as e:
-            print(f"写入日志失败: {e}")
+        self._logger.log(logging.getLevelName(level), message)
         
         if level in ["ERROR", "CRITICAL"]:
-            print(log_entry)
+            timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
+            print(f"[{timestamp}] [{level}] {message}")
+    
+    def flush(self):
+        """将缓冲的日志写入文件"""
+        self._handler.flush()
     
     def info(self, message):
         """记录信息级别日志"""
@@ -162,27 +386,125 @@ class Logger:
         """记录严重级别日志"""
         self.log(message, "CRITICAL")
 
+def ps_quote(value):
+    """将字符串转换为PowerShell单引号字符串字面量"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+def cached_probe(ttl=PROBE_CACHE_TTL):
+    """缓存SystemChecker检查方法的结果，在ttl秒内直接返回上次结果"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            key = (method.__name__,) + args
+            cached = self._cache.get(key)
+            now = time.monotonic()
+            if cached is not None and now - cached[0] < ttl:
+                return cached[1]
+            result = method(self, *args)
+            self._cache[key] = (now, result)
+            return result
+        wrapper.ttl = ttl
+        return wrapper
+    return decorator
+
 class SystemChecker:
     """系统检查和兼容性验证类"""
     
-    def __init__(self, logger):
+    def __init__(self, logger, verbose_diag=False):
         self.logger = logger
+        # 为True时使用docker info检查Docker服务并记录完整诊断信息
+        self.verbose_diag = verbose_diag
+        self._cache = {}
+        # 批量检查结果 (时间戳, 数据)
+        self._batch = None
+        
+    def clear_cache(self):
+        """清除缓存的检查结果"""
+        self._cache.clear()
+        self._batch = None
+        
+    def _run_batch_probe(self):
+        """用一个PowerShell进程收集Docker、WSL、虚拟化和磁盘信息"""
+        try:
+            result = subprocess.run(
+                ["powershell", "-NoProfile", "-Command", BATCH_PROBE_SCRIPT],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+                timeout=BATCH_PROBE_TIMEOUT
+            )
+            data = json.loads(result.stdout)
+            if isinstance(data, dict):
+                self._batch = (time.monotonic(), data)
+                return
+        except subprocess.TimeoutExpired:
+            self.logger.warning(f"批量系统检查超过{BATCH_PROBE_TIMEOUT}秒未完成，将逐项检查")
+        except Exception as e:
+            self.logger.warning(f"批量系统检查失败，将逐项检查: {e}")
+        self._batch = None
+        
+    def _batch_data(self, max_age=PROBE_CACHE_TTL):
+        """返回max_age秒内的批量检查结果，没有时返回None"""
+        batch = self._batch
+        if batch is not None and time.monotonic() - batch[0] < max_age:
+            return batch[1]
+        return None
+        
+    def _probe_fresh(self, probe):
+        """判断cached_probe装饰的检查方法是否有未过期的缓存结果"""
+        cached = self._cache.get((probe.__name__,))
+        return cached is not None and time.monotonic() - cached[0] < probe.ttl
+        
+    def run_all_checks(self):
+        """执行所有系统检查，返回检查结果字典"""
+        # 读取批量结果的检查项中有缓存过期时，才用一个进程批量收集信息
+        batch_probes = (self.is_docker_installed, self.check_virtualization,
+                        self.check_wsl, self.check_disk_space)
+        if not all(self._probe_fresh(probe) for probe in batch_probes):
+            self._run_batch_probe()
+        
+        # 批量检查缺失的项目回退到单独检查，并发执行
+        probes = {
+            "win_compat": self.is_windows_compatible,
+            "docker_installed": self.is_docker_installed,
+            "docker_running": self.is_docker_running,
+            "virtualization": self.check_virtualization,
+            "wsl": self.check_wsl,
+            "disk_space": self.check_disk_space,
+        }
+        with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+            futures = {name: executor.submit(probe) for name, probe in probes.items()}
+            wait(futures.values())
+        return {name: future.result() for name, future in futures.items()}
         
+    @cached_probe()
     def is_windows_compatible(self):
         """检查是否为兼容的Windows版本"""
-        if platform.system() != "Windows":
+        if sys.platform != "win32":
             self.logger.error("当前系统不是Windows系统")
             return False
             
-        win_version = platform.win32_ver()[0]
-        if float(win_version) < 10:
-            self.logger.error(f"Windows版本 {win_version} 不满足Docker Desktop要求")
+        # Docker Desktop的WSL2后端要求Windows 10 build 19041及以上（Windows 11的主版本号同样为10）
+        v = sys.getwindowsversion()
+        if v.major < 10 or (v.major == 10 and v.build < MIN_WINDOWS_BUILD):
+            self.logger.error(f"Windows版本 {v.major}.{v.minor}.{v.build} 不满足Docker Desktop要求")
             return False
             
         return True
         
+    @cached_probe()
     def is_docker_installed(self):
         """检查Docker是否已安装"""
+        batch = self._batch_data()
+        if batch is not None:
+            version = (batch.get("docker_version") or "").strip()
+            if version:
+                self.logger.info(f"Docker已安装: {version}")
+                return True
+            self.logger.info("Docker未安装或无法访问")
+            return False
+            
         try:
             result = subprocess.run(
                 ["docker", "--version"], 
@@ -200,70 +522,162 @@ class SystemChecker:
             self.logger.warning(f"检查Docker安装失败: {e}")
             return False
             
+    @cached_probe(ttl=DOCKER_RUNNING_CACHE_TTL)
     def is_docker_running(self):
         """检查Docker服务是否运行中"""
+        if self.verbose_diag:
+            return self._docker_info_running()
+            
+        batch = self._batch_data(DOCKER_RUNNING_CACHE_TTL)
+        if batch is not None:
+            output = (batch.get("docker_server") or "").strip()
+            if output and output != "null":
+                self.logger.info("Docker服务运行正常")
+                return True
+            self.logger.warning("Docker服务未运行")
+            return False
+            
         try:
+            # 只探测服务端版本，比docker info枚举镜像、网络和容器快得多
             result = subprocess.run(
-                ["docker", "info"], 
+                ["docker", "version", "--format", "{{json .Server}}"], 
                 stdout=subprocess.PIPE, 
                 stderr=subprocess.PIPE,
                 text=True
             )
-            if result.returncode == 0:
+            output = result.stdout.strip()
+            if result.returncode == 0 and output and output != "null":
                 self.logger.info("Docker服务运行正常")
                 return True
+                
+            try:
+                server = json.loads(output) if output else None
+            except ValueError:
+                server = None
+            if server is None:
+                # 命令行可用但无法连接到Docker守护进程
+                self.logger.warning(f"Docker服务未运行: {result.stderr.strip()}")
             else:
-                self.logger.warning("Docker服务未运行")
-                return False
+                self.logger.warning(f"Docker服务状态异常: {result.stderr.strip()}")
+            return False
+        except FileNotFoundError:
+            self.logger.warning("Docker服务未运行: 找不到docker命令")
+            return False
         except Exception as e:
             self.logger.warning(f"检查Docker服务状态失败: {e}")
             return False
             
-    def check_virtualization(self):
-        """检查虚拟化支持"""
+    def _docker_info_running(self):
+        """使用docker info检查Docker服务状态，输出完整诊断信息"""
         try:
-            # 使用systeminfo检查Hyper-V要求
             result = subprocess.run(
-                ["systeminfo"], 
+                ["docker", "info"], 
                 stdout=subprocess.PIPE, 
                 stderr=subprocess.PIPE,
                 text=True
             )
-            if "虚拟化已启用" in result.stdout or "Virtualization Support" in result.stdout:
-                self.logger.info("虚拟化已启用")
+            if result.returncode == 0:
+                self.logger.info(f"Docker服务运行正常:\n{result.stdout}")
                 return True
             else:
-                self.logger.warning("虚拟化可能未启用")
+                self.logger.warning(f"Docker服务未运行: {result.stderr}")
                 return False
         except Exception as e:
-            self.logger.warning(f"检查虚拟化支持失败: {e}")
+            self.logger.warning(f"检查Docker服务状态失败: {e}")
             return False
             
-    def check_wsl(self):
-        """检查WSL状态"""
+    @cached_probe()
+    def check_virtualization(self):
+        """检查虚拟化支持"""
+        batch = self._batch_data()
+        enabled = batch.get("virt") if batch is not None else None
+        if enabled is None:
+            enabled = self._query_virtualization()
+        if enabled is None:
+            # 快速查询均不可用时，回退到较慢的systeminfo
+            enabled = self._query_virtualization_systeminfo()
+            
+        if enabled:
+            self.logger.info("虚拟化已启用")
+            return True
+        else:
+            self.logger.warning("虚拟化可能未启用")
+            return False
+            
+    def _query_virtualization(self):
+        """直接查询虚拟化状态，无法确定时返回None"""
         try:
+            # 只查询所需的属性，避免systeminfo枚举整机信息
             result = subprocess.run(
-                ["wsl", "--status"], 
+                ["powershell", "-NoProfile", "-Command", VIRTUALIZATION_QUERY],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=5
+            )
+            output = result.stdout.strip()
+            if output in ("True", "False"):
+                return output == "True"
+        except Exception as e:
+            self.logger.warning(f"通过PowerShell检查虚拟化支持失败: {e}")
+            
+        try:
+            import ctypes
+            return bool(ctypes.windll.kernel32.IsProcessorFeaturePresent(PF_VIRT_FIRMWARE_ENABLED))
+        except Exception as e:
+            self.logger.warning(f"通过CPU特性检查虚拟化支持失败: {e}")
+            return None
+            
+    def _query_virtualization_systeminfo(self):
+        """使用systeminfo检查虚拟化状态"""
+        try:
+            # 使用systeminfo检查Hyper-V要求
+            result = subprocess.run(
+                ["systeminfo"], 
                 stdout=subprocess.PIPE, 
                 stderr=subprocess.PIPE,
                 text=True
             )
-            if result.returncode == 0:
-                self.logger.info("WSL已安装")
-                return True
-            else:
-                self.logger.warning("WSL未安装或配置不正确")
-                return False
+            return "虚拟化已启用" in result.stdout or "Virtualization Support" in result.stdout
         except Exception as e:
-            self.logger.warning(f"检查WSL状态失败: {e}")
+            self.logger.warning(f"检查虚拟化支持失败: {e}")
             return False
             
+    @cached_probe()
+    def check_wsl(self):
+        """检查WSL状态"""
+        batch = self._batch_data()
+        installed = batch.get("wsl") if batch is not None else None
+        if installed is None:
+            try:
+                result = subprocess.run(
+                    ["wsl", "--status"], 
+                    stdout=subprocess.PIPE, 
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
+                installed = result.returncode == 0
+            except Exception as e:
+                self.logger.warning(f"检查WSL状态失败: {e}")
+                return False
+                
+        if installed:
+            self.logger.info("WSL已安装")
+            return True
+        else:
+            self.logger.warning("WSL未安装或配置不正确")
+            return False
+            
+    @cached_probe(ttl=DISK_SPACE_CACHE_TTL)
     def check_disk_space(self, min_space_gb=10):
         """检查可用磁盘空间"""
         try:
-            # 检查C盘可用空间
-            disk_usage = shutil.disk_usage("C:\\")
-            free_space_gb = disk_usage.free / (1024 * 1024 * 1024)  # 转换为GB
+            batch = self._batch_data()
+            free_bytes = batch.get("disk") if batch is not None else None
+            if free_bytes is None:
+                # 检查C盘可用空间
+                free_bytes = self._query_free_bytes("C:\\")
+            free_space_gb = free_bytes / (1024 * 1024 * 1024)  # 转换为GB
             
             self.logger.info(f"C盘可用空间: {free_space_gb:.2f} GB")
             if free_space_gb < min_space_gb:
@@ -273,105 +687,278 @@ class SystemChecker:
         except Exception as e:
             self.logger.warning(f"检查磁盘空间失败: {e}")
             return False
+            
+    def _query_free_bytes(self, path):
+        """获取磁盘可用字节数"""
+        try:
+            import ctypes
+            free = ctypes.c_ulonglong(0)
+            if ctypes.windll.kernel32.GetDiskFreeSpaceExW(ctypes.c_wchar_p(path), None, None, ctypes.byref(free)):
+                return free.value
+        except (ImportError, AttributeError):
+            # 非Windows平台没有windll
+            pass
+        return shutil.disk_usage(path).free
+
+class DockerStatusSignals(QObject):
+    """Docker容器状态信号"""
+    
+    status_changed = pyqtSignal(bool, str)  # 容器是否存在, 容器状态
 
 class DockerManager:
     """Docker管理类"""
     
+    # 会写入docker-compose文件的设置项，其他设置变化时无需重新生成
+    COMPOSE_AFFECTING_KEYS = ("workspace_dir", "state_dir", "port")
+    
     def __init__(self, logger):
         self.logger = logger
+        self._client = None
+        # 容器状态缓存 (时间戳, (是否存在, 状态))
+        self._status_cache = None
+        # 容器事件监听
+        self.signals = DockerStatusSignals()
+        self._events = None
+        self._event_thread = None
+        
+    def _get_client(self):
+        """获取缓存的Docker SDK客户端，不可用时返回None"""
+        if docker_sdk is None:
+            return None
+        if self._client is None:
+            try:
+                self._client = docker_sdk.from_env()
+            except Exception as e:
+                self.logger.warning(f"无法连接Docker SDK客户端: {e}")
+                return None
+        return self._client
         
-    def install_docker_desktop(self, progress_callback=None):
-        """安装Docker Desktop"""
-        self.logger.info("开始安装Docker Desktop")
+    @staticmethod
+    def is_running_status(status):
+        """判断get_container_status返回的状态是否表示容器正在运行"""
+        return status == "running" or status.startswith("Up")
         
-        # 创建临时文件夹
-        temp_dir = tempfile.mkdtemp()
-        installer_path = os.path.join(temp_dir, "DockerDesktopInstaller.exe")
+    def download_docker_installer(self, progress_callback=None):
+        """下载Docker Desktop安装程序，成功时返回安装程序路径，失败时返回None"""
+        self.logger.info("开始下载Docker Desktop安装程序")
         
         try:
             # 下载安装程序
             if progress_callback:
                 progress_callback("正在下载Docker Desktop安装程序...", 10)
                 
-            self.logger.info(f"从 {DOCKER_DESKTOP_DOWNLOAD_URL} 下载安装程序")
-            
-            response = requests.get(DOCKER_DESKTOP_DOWNLOAD_URL, stream=True)
-            total_size = int(response.headers.get('content-length', 0))
-            
-            with open(installer_path, 'wb') as f:
-                if total_size == 0:
-                    f.write(response.content)
-                else:
-                    downloaded = 0
-                    for data in response.iter_content(chunk_size=4096):
-                        downloaded += len(data)
-                        f.write(data)
-                        if progress_callback and total_size > 0:
-                            percent = int(20 + (downloaded / total_size * 30))
-                            progress_callback(f"正在下载Docker Desktop安装程序... {downloaded//(1024*1024)}MB/{total_size//(1024*1024)}MB", percent)
-            
-            # 执行安装程序
+            return self._download_installer(progress_callback)
+        except Exception as e:
+            self.logger.error(f"Docker Desktop安装过程中出错: {str(e)}")
             if progress_callback:
-                progress_callback("正在安装Docker Desktop...", 50)
-                
-            self.logger.info("开始安装Docker Desktop")
-            
-            # 使用管理员权限运行安装程序
-            process = subprocess.Popen(
-                ["powershell", "Start-Process", installer_path, "-ArgumentList 'install --quiet'", "-Verb", "RunAs", "-Wait"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                shell=True
-            )
-            
-            stdout, stderr = process.communicate()
+                progress_callback(f"安装出错: {str(e)}", 100)
+            return None
+    
+    def run_docker_installer(self, installer_path, progress_callback=None, finished_callback=None, parent=None):
+        """使用QProcess运行安装程序，输出和结束通知由Qt事件循环驱动，无需额外线程"""
+        if progress_callback:
+            progress_callback("正在安装Docker Desktop...", 50)
             
-            if process.returncode == 0:
+        self.logger.info("开始安装Docker Desktop")
+        
+        # 使用管理员权限运行安装程序
+        process = QProcess(parent)
+        process.setProgram("powershell")
+        # 路径作为PowerShell单引号字符串传入；-PassThru取得安装程序的退出码并作为powershell的退出码返回
+        # Start-Process失败（如用户拒绝UAC提权）时以非零退出码结束，不能被当作安装成功
+        command = (
+            "$ErrorActionPreference = 'Stop'; "
+            f"$p = Start-Process -FilePath {ps_quote(installer_path)} -ArgumentList 'install --quiet' "
+            "-Verb RunAs -Wait -PassThru; if (-not $p) { exit 1 }; exit $p.ExitCode"
+        )
+        process.setArguments(["-NoProfile", "-NonInteractive", "-Command", command])
+        
+        def on_output():
+            output = bytes(process.readAllStandardOutput()).decode('utf-8', errors='replace').strip()
+            if output and progress_callback:
+                progress_callback(output, 60)
+        
+        def on_finished(exit_code, exit_status):
+            if exit_status == QProcess.NormalExit and exit_code == 0:
                 self.logger.info("Docker Desktop安装成功")
                 if progress_callback:
                     progress_callback("Docker Desktop安装完成，等待启动服务...", 80)
-                return True
+                # 安装成功后不再需要缓存的安装程序
+                self._remove_cached_installer()
+                success = True
             else:
-                self.logger.error(f"Docker Desktop安装失败: {stderr.decode('utf-8')}")
+                error = bytes(process.readAllStandardError()).decode('utf-8', errors='replace')
+                self.logger.error(f"Docker Desktop安装失败: {error}")
                 if progress_callback:
-                    progress_callback(f"Docker Desktop安装失败: {stderr.decode('utf-8')}", 100)
-                return False
+                    progress_callback(f"Docker Desktop安装失败: {error}", 100)
+                success = False
+            if finished_callback:
+                finished_callback(success)
+        
+        def on_error(error):
+            # 进程无法启动时不会发出finished信号
+            if error == QProcess.FailedToStart:
+                self.logger.error(f"Docker Desktop安装过程中出错: {process.errorString()}")
+                if progress_callback:
+                    progress_callback(f"安装出错: {process.errorString()}", 100)
+                if finished_callback:
+                    finished_callback(False)
+        
+        process.readyReadStandardOutput.connect(on_output)
+        process.finished.connect(on_finished)
+        process.errorOccurred.connect(on_error)
+        process.start()
+        return process
+    
+    def _download_installer(self, progress_callback=None):
+        """下载Docker Desktop安装程序到配置目录，支持断点续传，返回安装程序路径"""
+        # requests及其依赖加载较慢，只在需要下载时导入
+        import requests
+        
+        installer_path = DOCKER_INSTALLER_PATH
+        
+        # 获取远程文件信息，判断本地缓存是否可用
+        head = requests.head(DOCKER_DESKTOP_DOWNLOAD_URL, allow_redirects=True)
+        head.raise_for_status()
+        total_size = int(head.headers.get('content-length', 0))
+        etag = head.headers.get('etag', "")
+        
+        meta = {}
+        if os.path.exists(DOCKER_INSTALLER_META_FILE):
+            try:
+                with open(DOCKER_INSTALLER_META_FILE, 'r') as f:
+                    meta = json.load(f)
+            except Exception as e:
+                self.logger.warning(f"读取安装程序缓存信息失败: {e}")
+        
+        existing = os.path.getsize(installer_path) if os.path.exists(installer_path) else 0
+        if existing and (meta.get("etag") != etag or meta.get("content_length") != total_size or existing > total_size):
+            # 远程文件已更新或本地文件无效，重新下载
+            self.logger.info("缓存的安装程序已过期，重新下载")
+            existing = 0
+            
+        if total_size and existing == total_size:
+            self.logger.info(f"使用已缓存的安装程序: {installer_path}")
+            self._verify_installer(installer_path)
+            return installer_path
+        
+        with open(DOCKER_INSTALLER_META_FILE, 'w') as f:
+            json.dump({"url": DOCKER_DESKTOP_DOWNLOAD_URL, "etag": etag, "content_length": total_size}, f)
+        
+        headers = {}
+        if existing and total_size:
+            headers["Range"] = f"bytes={existing}-"
+            self.logger.info(f"从 {existing//(1024*1024)}MB 处继续下载安装程序")
+        else:
+            self.logger.info(f"从 {DOCKER_DESKTOP_DOWNLOAD_URL} 下载安装程序")
+        
+        response = requests.get(DOCKER_DESKTOP_DOWNLOAD_URL, headers=headers, stream=True)
+        response.raise_for_status()
+        if response.status_code != 206:
+            # 服务器不支持断点续传，从头下载
+            existing = 0
+        
+        with open(installer_path, 'ab' if existing else 'wb') as f:
+            if total_size == 0:
+                f.write(response.content)
+            else:
+                downloaded = existing
+                last_update = 0.0
+                # 由后台线程写入磁盘，使网络读取和磁盘写入重叠进行
+                chunks = queue.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+                write_errors = []
+                writer = threading.Thread(target=self._write_chunks, args=(f, chunks, write_errors), daemon=True)
+                writer.start()
+                try:
+                    for data in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if write_errors:
+                            break
+                        chunks.put(data)
+                        downloaded += len(data)
+                        # 限制进度回调频率，避免每个数据块都更新界面
+                        now = time.monotonic()
+                        if progress_callback and (now - last_update >= PROGRESS_UPDATE_INTERVAL or downloaded >= total_size):
+                            last_update = now
+                            percent = int(20 + (downloaded / total_size * 30))
+                            progress_callback(f"正在下载Docker Desktop安装程序... {downloaded//(1024*1024)}MB/{total_size//(1024*1024)}MB", percent)
+                finally:
+                    chunks.put(None)
+                    writer.join()
                 
-        except Exception as e:
-            self.logger.error(f"Docker Desktop安装过程中出错: {str(e)}")
-            if progress_callback:
-                progress_callback(f"安装出错: {str(e)}", 100)
-            return False
-        finally:
-            # 清理临时文件
+                if write_errors:
+                    raise write_errors[0]
+        
+        if total_size and os.path.getsize(installer_path) != total_size:
+            raise IOError("安装程序下载不完整，请重试")
+        
+        self._verify_installer(installer_path)
+        return installer_path
+    
+    def _verify_installer(self, installer_path):
+        """校验安装程序的SHA-256"""
+        if not DOCKER_DESKTOP_SHA256:
+            return
+        
+        sha256 = hashlib.sha256()
+        with open(installer_path, 'rb') as f:
+            for data in iter(functools.partial(f.read, DOWNLOAD_CHUNK_SIZE), b""):
+                sha256.update(data)
+        
+        if sha256.hexdigest().lower() != DOCKER_DESKTOP_SHA256.lower():
+            self._remove_cached_installer()
+            raise IOError("安装程序校验失败，文件可能已损坏")
+    
+    def _remove_cached_installer(self):
+        """删除缓存的安装程序"""
+        for path in (DOCKER_INSTALLER_PATH, DOCKER_INSTALLER_META_FILE):
             try:
-                shutil.rmtree(temp_dir)
-            except:
-                pass
+                if os.path.exists(path):
+                    os.remove(path)
+            except Exception as e:
+                self.logger.warning(f"删除缓存的安装程序失败: {e}")
+    
+    def _write_chunks(self, f, chunks, errors):
+        """从队列中取出数据块写入文件，收到None时结束"""
+        while True:
+            data = chunks.get()
+            if data is None:
+                break
+            # 出错后继续取出数据，避免下载线程阻塞在已满的队列上
+            if not errors:
+                try:
+                    f.write(data)
+                except Exception as e:
+                    errors.append(e)
     
     def generate_compose_file(self, config, target_path):
         """生成docker-compose.yaml文件"""
         try:
-            workspace_path = config.get_setting("workspace_dir")
             workspace_dir = config.get_setting("workspace_dir")
             state_dir = config.get_setting("state_dir")
             port = config.get_setting("port")
             
-            # 确保目录存在
-            os.makedirs(workspace_dir, exist_ok=True)
-            os.makedirs(state_dir, exist_ok=True)
-            
-            # 替换模板中的变量
-            compose_content = DOCKER_COMPOSE_TEMPLATE.format(
+            # 替换模板中的变量（目录由修改设置的调用方负责创建）
+            compose_content = _COMPOSE_TPL.substitute(
                 workspace_path="~/Docker_Workspace",  # 容器内的路径
                 workspace_dir=workspace_dir.replace("\\", "/"),  # Host路径，转换为正斜杠
                 state_dir=state_dir.replace("\\", "/"),
                 port=port
             )
             
-            # 写入文件
-            with open(target_path, "w", encoding="utf-8") as f:
-                f.write(compose_content)
+            # 内容未变化时不重写文件，避免触发Docker Desktop的文件监视
+            data = compose_content.encode("utf-8")
+            if os.path.exists(target_path):
+                with open(target_path, "rb") as f:
+                    old_digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+                if old_digest == hashlib.blake2b(data, digest_size=16).digest():
+                    self.logger.info(f"docker-compose.yaml无变化: {target_path}")
+                    return True
+            
+            # 写入文件（先写临时文件再替换）
+            tmp_path = target_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target_path)
                 
             self.logger.info(f"docker-compose.yaml已生成: {target_path}")
             return True
@@ -380,17 +967,16 @@ class DockerManager:
             self.logger.error(f"生成docker-compose.yaml失败: {str(e)}")
             return False
     
-    def start_openhands(self, compose_file):
-        """启动OpenHands容器"""
+    def _run_compose(self, compose_file, args, action, ok_msg, fail_msg):
+        """以compose_file执行一次docker compose命令，返回(是否成功, 输出)"""
         try:
-            self.logger.info(f"正在启动OpenHands，使用配置文件: {compose_file}")
+            self.logger.info(f"正在{action}OpenHands，使用配置文件: {compose_file}")
             
             # 确认目录
             compose_dir = os.path.dirname(compose_file)
             
-            # 执行docker-compose up
             process = subprocess.Popen(
-                ["docker-compose", "-f", compose_file, "up", "-d"],
+                DOCKER_COMPOSE_CMD + ["-f", compose_file] + args,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
@@ -398,53 +984,102 @@ class DockerManager:
             )
             
             stdout, stderr = process.communicate()
+            self._status_cache = None
             
             if process.returncode == 0:
-                self.logger.info("OpenHands启动成功")
+                self.logger.info(ok_msg)
                 return True, stdout
             else:
-                self.logger.error(f"OpenHands启动失败: {stderr}")
+                self.logger.error(f"{fail_msg}: {stderr}")
                 return False, stderr
                 
         except Exception as e:
-            self.logger.error(f"启动OpenHands过程中出错: {str(e)}")
+            self.logger.error(f"{action}OpenHands过程中出错: {str(e)}")
             return False, str(e)
     
+    def start_openhands(self, compose_file):
+        """启动OpenHands容器"""
+        return self._run_compose(compose_file, ["up", "-d"], "启动", "OpenHands启动成功", "OpenHands启动失败")
+    
     def stop_openhands(self, compose_file):
         """停止OpenHands容器"""
-        try:
-            self.logger.info(f"正在停止OpenHands，使用配置文件: {compose_file}")
-            
-            # 确认目录
-            compose_dir = os.path.dirname(compose_file)
+        return self._run_compose(compose_file, ["down"], "停止", "OpenHands已停止", "停止OpenHands失败")
+    
+    def restart_openhands(self, compose_file):
+        """重启OpenHands容器，只调用一次docker compose"""
+        # 重建容器而不是compose restart，这样修改后的端口和目录设置也会生效
+        return self._run_compose(compose_file, ["up", "-d", "--force-recreate"],
+                                 "重启", "OpenHands重启成功", "OpenHands重启失败")
             
-            # 执行docker-compose down
-            process = subprocess.Popen(
-                ["docker-compose", "-f", compose_file, "down"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=compose_dir
+    def get_container_status(self):
+        """获取OpenHands容器状态，短时间内的重复查询直接返回缓存结果"""
+        cache = self._status_cache
+        if cache is not None and time.monotonic() - cache[0] < STATUS_CACHE_TTL:
+            return cache[1]
+        result = self._query_container_status()
+        self._status_cache = (time.monotonic(), result)
+        return result
+    
+    def start_event_watcher(self):
+        """在后台线程监听OpenHands容器事件，状态变化时发出status_changed信号，Docker SDK不可用时返回False"""
+        if self._event_thread is not None and self._event_thread.is_alive():
+            return True
+        if docker_sdk is None:
+            return False
+        try:
+            # 事件流长期占用连接，使用独立的客户端
+            client = docker_sdk.from_env()
+            self._events = client.events(
+                decode=True,
+                filters={"type": "container", "container": CONTAINER_NAME, "event": CONTAINER_STATE_EVENTS}
             )
-            
-            stdout, stderr = process.communicate()
-            
-            if process.returncode == 0:
-                self.logger.info("OpenHands已停止")
-                return True, stdout
-            else:
-                self.logger.error(f"停止OpenHands失败: {stderr}")
-                return False, stderr
-                
         except Exception as e:
-            self.logger.error(f"停止OpenHands过程中出错: {str(e)}")
-            return False, str(e)
-            
-    def get_container_status(self):
-        """获取OpenHands容器状态"""
+            self.logger.warning(f"无法监听Docker事件: {e}")
+            return False
+        
+        self._event_thread = threading.Thread(target=self._watch_events, args=(self._events,), daemon=True)
+        self._event_thread.start()
+        return True
+    
+    def stop_event_watcher(self):
+        """停止监听容器事件"""
+        if self._events is not None:
+            try:
+                self._events.close()
+            except Exception:
+                pass
+            self._events = None
+    
+    def _watch_events(self, events):
+        """处理容器事件，更新状态缓存并通知界面"""
+        try:
+            for event in events:
+                self.logger.info(f"OpenHands容器事件: {event.get('status')}")
+                result = self._query_container_status()
+                self._status_cache = (time.monotonic(), result)
+                self.signals.status_changed.emit(*result)
+        except Exception as e:
+            self.logger.warning(f"Docker事件监听已停止: {e}")
+    
+    def _query_container_status(self):
+        """查询OpenHands容器状态"""
+        client = self._get_client()
+        if client is not None:
+            try:
+                # 直接通过Docker API查询，无需启动子进程
+                status = client.containers.get(CONTAINER_NAME).status
+                self.logger.info(f"OpenHands容器状态: {status}")
+                return True, status
+            except docker_sdk.errors.NotFound:
+                self.logger.info("OpenHands容器未运行")
+                return False, "未运行"
+            except Exception as e:
+                self.logger.warning(f"通过Docker SDK获取容器状态失败，改用命令行: {e}")
+                self._client = None
+                
         try:
             process = subprocess.Popen(
-                ["docker", "ps", "-a", "--filter", "name=openhands-app", "--format", "{{.Status}}"],
+                ["docker", "ps", "-a", "--filter", f"name={CONTAINER_NAME}", "--format", "{{.Status}}"],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True
@@ -464,6 +1099,17 @@ class DockerManager:
             self.logger.error(f"获取容器状态失败: {str(e)}")
             return False, f"错误: {str(e)}"
         
+    def stream_logs(self, container=CONTAINER_NAME, n=LOG_TAIL_LINES):
+        """通过Docker API持续读取容器日志，返回可关闭的字节流；SDK不可用时返回None"""
+        client = self._get_client()
+        if client is None:
+            return None
+        try:
+            return client.containers.get(container).logs(stream=True, follow=True, tail=n)
+        except Exception as e:
+            self.logger.warning(f"通过Docker SDK读取日志流失败，改用命令行: {e}")
+            return None
+        
 class SetupWizard(QWizard):
     """安装设置向导"""
     
@@ -475,6 +1121,12 @@ class SetupWizard(QWizard):
         self.system_checker = system_checker
         self.docker_manager = docker_manager
         
+        # 后台任务线程池
+        self._pool = QThreadPool.globalInstance()
+        
+        # 本次运行中已创建的目录
+        self._dirs_created = set()
+        
         self.setWindowTitle(f"{APP_NAME} 安装向导")
         self.setWizardStyle(QWizard.ModernStyle)
         
@@ -515,19 +1167,7 @@ class SetupWizard(QWizard):
         '''
         
         # 介绍文字
-        intro_text = """
-        <h3>欢迎使用 OpenHands PC 部署助手！</h3>
-        <p>本向导将帮助您完成以下设置：</p>
-        <ul>
-            <li>检查系统兼容性</li>
-            <li>安装 Docker Desktop（如果需要）</li>
-            <li>配置 OpenHands 运行环境</li>
-            <li>部署并启动 OpenHands</li>
-        </ul>
-        <p>点击"下一步"开始安装流程。</p>
-        """
-        
-        intro_label = QLabel(intro_text)
+        intro_label = QLabel(_INTRO_HTML)
         intro_label.setWordWrap(True)
         intro_label.setTextFormat(Qt.RichText)
         
@@ -597,46 +1237,52 @@ class SetupWizard(QWizard):
         self.start_check_button.setEnabled(False)
         self.check_summary.setText("正在检查系统...")
         
-        # 使用QTimer延迟执行，以便UI可以更新
-        QTimer.singleShot(100, self._run_system_checks)
+        # 在线程池中执行检查，避免阻塞界面
+        self._check_worker = Worker(self.system_checker.run_all_checks)
+        self._check_worker.signals.result.connect(self._apply_check_results)
+        self._check_worker.signals.error.connect(self._system_checks_failed)
+        self._pool.start(self._check_worker)
     
-    def _run_system_checks(self):
-        """实际执行系统检查的方法"""
-        all_passed = True
-        
+    def _system_checks_failed(self, message):
+        """系统检查出错处理"""
+        self.logger.error(f"系统检查失败: {message}")
+        self.check_summary.setText(f"系统检查失败: {message}")
+        self.start_check_button.setEnabled(True)
+    
+    def _apply_check_results(self, results):
+        """在界面线程中显示系统检查结果"""
         # Windows版本检查
-        win_compat = self.system_checker.is_windows_compatible()
+        win_compat = results["win_compat"]
         self.win_compat_label.setText(f"Windows版本检查: {'通过' if win_compat else '不兼容'}")
         self.check_results["win_compat"] = win_compat
-        all_passed = all_passed and win_compat
         
         # 虚拟化支持检查
-        virtualization = self.system_checker.check_virtualization()
+        virtualization = results["virtualization"]
         self.virtualization_label.setText(f"虚拟化支持检查: {'通过' if virtualization else '未启用'}")
         self.check_results["virtualization"] = virtualization
-        all_passed = all_passed and virtualization
         
         # WSL检查
-        wsl = self.system_checker.check_wsl()
+        wsl = results["wsl"]
         self.wsl_label.setText(f"WSL检查: {'通过' if wsl else '未安装或未启用'}")
         self.check_results["wsl"] = wsl
         # WSL问题不是严重错误，可以继续
         
         # 磁盘空间检查
-        disk_space = self.system_checker.check_disk_space()
+        disk_space = results["disk_space"]
         self.disk_space_label.setText(f"磁盘空间检查: {'通过' if disk_space else '空间不足'}")
         self.check_results["disk_space"] = disk_space
-        all_passed = all_passed and disk_space
+        
+        all_passed = win_compat and virtualization and disk_space
         
         # Docker安装检查
-        docker_installed = self.system_checker.is_docker_installed()
+        docker_installed = results["docker_installed"]
         self.docker_install_label.setText(f"Docker安装检查: {'已安装' if docker_installed else '未安装'}")
         self.check_results["docker_installed"] = docker_installed
         # Docker未安装不是错误，会在后续步骤安装
         
         # Docker运行状态检查
         if docker_installed:
-            docker_running = self.system_checker.is_docker_running()
+            docker_running = results["docker_running"]
             self.docker_running_label.setText(f"Docker运行状态: {'运行中' if docker_running else '未运行'}")
             self.check_results["docker_running"] = docker_running
         else:
@@ -741,11 +1387,25 @@ class SetupWizard(QWizard):
         self.docker_install_status.setText("正在准备安装Docker Desktop...")
         self.docker_install_progress.setValue(5)
         
-        # 创建安装线程
-        self.install_thread = DockerInstallThread(self.docker_manager)
-        self.install_thread.progress_signal.connect(self.update_docker_install_progress)
-        self.install_thread.finished.connect(self.docker_install_finished)
-        self.install_thread.start()
+        # 在线程池中下载安装程序，下载完成后由QProcess运行安装程序
+        self._download_worker = Worker(self.docker_manager.download_docker_installer, with_progress=True)
+        self._download_worker.signals.progress.connect(self.update_docker_install_progress)
+        self._download_worker.signals.result.connect(self.docker_download_finished)
+        self._download_worker.signals.error.connect(lambda message: self.docker_download_finished(None))
+        self._pool.start(self._download_worker)
+    
+    def docker_download_finished(self, installer_path):
+        """安装程序下载完成处理"""
+        if not installer_path:
+            self.docker_install_finished(False)
+            return
+        
+        self.install_process = self.docker_manager.run_docker_installer(
+            installer_path,
+            self.update_docker_install_progress,
+            self.docker_install_finished,
+            parent=self
+        )
     
     def update_docker_install_progress(self, message, value):
         """更新Docker安装进度"""
@@ -765,6 +1425,7 @@ class SetupWizard(QWizard):
                               "Docker Desktop安装失败。请手动安装Docker Desktop，然后继续安装向导。")
         
         # 重新检测Docker状态
+        self.system_checker.clear_cache()
         self.initDockerInstallPage()
         self.docker_install_button.setEnabled(True)
     
@@ -807,6 +1468,7 @@ class SetupWizard(QWizard):
         # 端口配置
         network_layout.addWidget(QLabel("Web端口:"), 0, 0)
         self.port_edit = QLineEdit(self.config.get_setting("port"))
+        self.port_edit.setValidator(QIntValidator(1, 65535, self))
         network_layout.addWidget(self.port_edit, 0, 1)
         
         network_group.setLayout(network_layout)
@@ -834,47 +1496,34 @@ class SetupWizard(QWizard):
         
         page.setLayout(layout)
         
-        # 注册字段，用于验证
-        page.registerField("workspace_dir*", self.workspace_dir_edit)
-        page.registerField("state_dir*", self.state_dir_edit)
-        page.registerField("port*", self.port_edit)
+        # 注册字段；字段已预填默认值，不使用"*"必填标记（QWizard要求必填字段的值与初始值不同）
+        page.registerField("workspace_dir", self.workspace_dir_edit)
+        page.registerField("state_dir", self.state_dir_edit)
+        page.registerField("port", self.port_edit)
         
         # 页面验证处理
         page.validatePage = self.validateConfigPage
-
-        self.workspace_dir_edit.textChanged.connect(self.updateNextButtonState)
-        self.state_dir_edit.textChanged.connect(self.updateNextButtonState)
-        self.port_edit.textChanged.connect(self.updateNextButtonState)
         
-        return page
+        # 由isComplete决定"下一步"按钮状态，输入变化时通知QWizard重新检查
+        page.isComplete = self.isConfigPageComplete
+        self.workspace_dir_edit.textChanged.connect(page.completeChanged)
+        self.state_dir_edit.textChanged.connect(page.completeChanged)
+        self.port_edit.textChanged.connect(page.completeChanged)
 
-    def updateNextButtonState(self):
-        """Update Next button state based on field validation"""
-        # Check if fields are valid and enable/disable Next button accordingly
-        workspace_dir = self.workspace_dir_edit.text()
-        state_dir = self.state_dir_edit.text()
-        port = self.port_edit.text()
-        
-        # Basic validation
-        is_valid = bool(workspace_dir.strip() and state_dir.strip() and port.strip())
-        
-        # Additional port validation
-        if is_valid and port.strip():
-            try:
-                port_num = int(port)
-                is_valid = 1 <= port_num <= 65535
-            except ValueError:
-                is_valid = False
-        
-        # Update button state
-        self.button(QWizard.NextButton).setEnabled(is_valid)
+        return page
 
     def browse_directory(self, line_edit):
         """浏览并选择目录"""
-        directory = QFileDialog.getExistingDirectory(self, "选择目录", line_edit.text())
+        directory = QFileDialog.getExistingDirectory(self, "选择目录", line_edit.text(), BROWSE_DIR_OPTIONS)
         if directory:
             line_edit.setText(directory)
 
+    def isConfigPageComplete(self):
+        """目录不为空且端口通过验证器时才允许进入下一步"""
+        return bool(self.workspace_dir_edit.text().strip()
+                    and self.state_dir_edit.text().strip()
+                    and self.port_edit.hasAcceptableInput())
+
     def validateConfigPage(self):
         """验证配置页面内容并保存设置"""
         # 获取配置值
@@ -895,16 +1544,22 @@ class SetupWizard(QWizard):
             return False
         
         # 保存设置
-        self.config.update_setting("workspace_dir", workspace_dir)
-        self.config.update_setting("state_dir", state_dir)
-        self.config.update_setting("port", port)
-        self.config.update_setting("auto_start", auto_start)
-        self.config.update_setting("minimize_to_tray", minimize_to_tray)
+        with self.config.batch():
+            self.config.update_settings({
+                "workspace_dir": workspace_dir,
+                "state_dir": state_dir,
+                "port": port,
+                "auto_start": auto_start,
+                "minimize_to_tray": minimize_to_tray,
+            })
         
         # 确保目录存在
         try:
-            os.makedirs(workspace_dir, exist_ok=True)
-            os.makedirs(state_dir, exist_ok=True)
+            for path in (workspace_dir, state_dir):
+                # 在向导中前后翻页时不重复创建已创建过的目录
+                if path not in self._dirs_created:
+                    os.makedirs(path, exist_ok=True)
+                    self._dirs_created.add(path)
         except Exception as e:
             QMessageBox.warning(self, "目录创建失败", f"无法创建目录: {str(e)}")
             return False
@@ -921,18 +1576,7 @@ class SetupWizard(QWizard):
         layout = QVBoxLayout()
         
         # 完成消息
-        completion_text = """
-        <h3>恭喜！OpenHands设置已完成。</h3>
-        <p>您已经成功完成了OpenHands的安装配置。接下来您可以：</p>
-        <ul>
-            <li>启动OpenHands服务</li>
-            <li>使用Web浏览器访问OpenHands界面</li>
-            <li>通过系统托盘图标管理OpenHands</li>
-        </ul>
-        <p>点击"完成"按钮关闭向导并启动OpenHands管理器。</p>
-        """
-        
-        completion_label = QLabel(completion_text)
+        completion_label = QLabel(_COMPLETION_HTML)
         completion_label.setWordWrap(True)
         completion_label.setTextFormat(Qt.RichText)
         
@@ -957,7 +1601,8 @@ class SetupWizard(QWizard):
         """完成安装向导"""
         # 生成docker-compose文件
         compose_dir = os.path.join(CONFIG_DIR, "compose")
-        os.makedirs(compose_dir, exist_ok=True)
+        if not os.path.isdir(compose_dir):
+            os.makedirs(compose_dir, exist_ok=True)
         compose_file = os.path.join(compose_dir, "docker-compose.yaml")
         
         success = self.docker_manager.generate_compose_file(self.config, compose_file)
@@ -965,36 +1610,159 @@ class SetupWizard(QWizard):
             QMessageBox.warning(self, "配置文件生成失败", "无法生成docker-compose配置文件，请检查设置")
             return False
         
-        # 保存compose文件路径到设置
-        self.config.update_setting("compose_file", compose_file)
-        
-        # 标记安装向导已完成
-        self.config.update_setting("setup_completed", True)
-        self.config.update_setting("setup_date", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-        
-        # 是否自动启动
-        self.config.update_setting("launch_on_exit", self.launch_on_exit_check.isChecked())
+        with self.config.batch():
+            # 保存compose文件路径到设置
+            self.config.update_setting("compose_file", compose_file)
+            
+            # 标记安装向导已完成
+            self.config.update_setting("setup_completed", True)
+            self.config.update_setting("setup_date", datetime.now().isoformat(sep=" ", timespec="seconds"))
+            
+            # 是否自动启动
+            self.config.update_setting("launch_on_exit", self.launch_on_exit_check.isChecked())
         
         return True
+    
+    def accept(self):
+        """向导完成时将设置写入磁盘"""
+        self.config.flush()
+        super().accept()
         
-class DockerInstallThread(QThread):
-    """Docker安装线程"""
+class WorkerSignals(QObject):
+    """后台任务信号"""
+    
+    progress = pyqtSignal(str, int)  # 进度信息
+    result = pyqtSignal(object)  # 任务返回值
+    error = pyqtSignal(str)  # 任务抛出的异常信息
     
-    progress_signal = pyqtSignal(str, int)  # 用于更新安装进度的信号
-    finished = pyqtSignal(bool)  # 安装完成信号，带成功/失败状态
+class Worker(QRunnable):
+    """在QThreadPool中执行函数的后台任务"""
     
-    def __init__(self, docker_manager):
+    def __init__(self, fn, *args, with_progress=False, **kwargs):
         super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        # 需要时将进度信号作为progress_callback传给任务函数
+        if with_progress:
+            self.kwargs["progress_callback"] = self.signals.progress.emit
+        
+    def run(self):
+        """执行任务并通过信号返回结果"""
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+        
+class LogReaderThread(QThread):
+    """持续读取OpenHands容器日志的线程，优先使用Docker API，否则使用docker logs -f"""
+    
+    line_ready = pyqtSignal(str)  # 读取到的一行日志
+    
+    def __init__(self, docker_manager, parent=None):
+        super().__init__(parent)
         self.docker_manager = docker_manager
+        self._stream = None
+        self._process = None
+        self._stopped = False
         
     def run(self):
-        """执行Docker安装"""
-        success = self.docker_manager.install_docker_desktop(self.update_progress)
-        self.finished.emit(success)
+        """读取日志输出，每行发出一次信号"""
+        self._stream = self.docker_manager.stream_logs()
+        if self._stream is not None:
+            self._read_stream()
+            return
+        self._read_process()
         
-    def update_progress(self, message, value):
-        """更新进度信息"""
-        self.progress_signal.emit(message, value)
+    def _read_stream(self):
+        """从Docker API日志流中读取，按行拆分后发出"""
+        pending = b""
+        try:
+            if self._stopped:
+                self._stream.close()
+            for chunk in self._stream:
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    self.line_ready.emit(line.decode("utf-8", "replace"))
+        except Exception as e:
+            if not self._stopped:
+                self.line_ready.emit(f"获取日志失败: {str(e)}")
+        if pending:
+            self.line_ready.emit(pending.decode("utf-8", "replace"))
+        
+    def _read_process(self):
+        """通过docker logs -f子进程读取"""
+        try:
+            self._process = subprocess.Popen(
+                ["docker", "logs", "-f", "--tail", str(LOG_TAIL_LINES), CONTAINER_NAME],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                encoding='utf-8',
+                errors='replace',  # Replace characters that can't be decoded
+                bufsize=1
+            )
+            if self._stopped:
+                self._process.terminate()
+            for line in self._process.stdout:
+                self.line_ready.emit(line.rstrip("\n"))
+        except Exception as e:
+            self.line_ready.emit(f"获取日志失败: {str(e)}")
+        
+    def stop(self):
+        """关闭日志流或结束docker logs进程"""
+        self._stopped = True
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+        
+class DockerEventsThread(QThread):
+    """通过docker events命令监听OpenHands容器状态变化的线程"""
+    
+    state_changed = pyqtSignal(str)  # 容器事件，如start、die、stop
+    
+    def __init__(self, logger):
+        super().__init__()
+        self.logger = logger
+        self._process = None
+        self._stopped = False
+        
+    def run(self):
+        """持续读取docker events输出，每个事件发出一次信号"""
+        command = ["docker", "events", "--filter", f"container={CONTAINER_NAME}", "--format", "{{.Status}}"]
+        for event in CONTAINER_STATE_EVENTS:
+            command += ["--filter", f"event={event}"]
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors='replace'
+            )
+            for line in self._process.stdout:
+                event = line.strip()
+                if event:
+                    self.state_changed.emit(event)
+            stderr = self._process.stderr.read().strip()
+            returncode = self._process.wait()
+            if not self._stopped:
+                self.logger.warning(f"Docker事件监听已停止，退出码: {returncode} {stderr}")
+        except Exception as e:
+            self.logger.warning(f"Docker事件监听已停止: {e}")
+        
+    def stop(self):
+        """结束docker events进程"""
+        self._stopped = True
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
         
 class MainWindow(QMainWindow):
     """主窗口类"""
@@ -1009,7 +1777,18 @@ class MainWindow(QMainWindow):
         
         # 应用程序状态
         self.is_service_running = False
+        self._events_thread = None
+        self.log_reader = None
         self.compose_file = self.config.get_setting("compose_file", "")
+        # 启动时检查一次compose文件，之后只在重新生成时更新，按钮处理中不再重复stat
+        self._compose_file_ok = bool(self.compose_file) and os.path.exists(self.compose_file)
+        
+        # docker compose命令在线程池中执行，避免阻塞界面
+        self._pool = QThreadPool.globalInstance()
+        self._service_worker = None
+        
+        # 上次应用的开机自启动设置；None表示本次运行中尚未应用过
+        self._last_auto_start = None
         
         # 设置窗口
         self.setup_ui()
@@ -1017,13 +1796,16 @@ class MainWindow(QMainWindow):
         # 初始化系统托盘
         self.setup_tray()
         
+        # 容器状态变化时由Docker事件推送更新
+        self.docker_manager.signals.status_changed.connect(self.apply_container_status)
+        
         # 自动检查服务状态
         self.check_service_status()
         
-        # 状态刷新计时器
+        # 状态变化由Docker事件推送，计时器只作为兜底
         self.status_timer = QTimer(self)
         self.status_timer.timeout.connect(self.check_service_status)
-        self.status_timer.start(10000)  # 每10秒更新一次状态
+        self.status_timer.start(60000)  # 每60秒更新一次状态
         
     def setup_ui(self):
         """设置用户界面"""
@@ -1032,10 +1814,7 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(800, 600)
 
         # 设置窗口图标
-        logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "polly.ico")
-        if os.path.exists(logo_path):
-            app_icon = QIcon(logo_path)
-            self.setWindowIcon(app_icon)
+        self.setWindowIcon(_tray_icon())
         
         # 创建中央窗口部件
         central_widget = QWidget()
@@ -1047,10 +1826,7 @@ class MainWindow(QMainWindow):
         # 添加标题标签
         title_label = QLabel(f"{APP_NAME}")
         title_label.setAlignment(Qt.AlignCenter)
-        title_font = QFont()
-        title_font.setPointSize(16)
-        title_font.setBold(True)
-        title_label.setFont(title_font)
+        title_label.setFont(_title_font())
         main_layout.addWidget(title_label)
         
         # 状态指示区域
@@ -1063,6 +1839,13 @@ class MainWindow(QMainWindow):
         self.status_text_label = QLabel("正在检查服务状态...")
         status_layout.addWidget(self.status_text_label, 1)
         
+        # 服务操作进行中时显示的忙碌指示
+        self.busy_progress = QProgressBar()
+        self.busy_progress.setRange(0, 0)
+        self.busy_progress.setMaximumWidth(120)
+        self.busy_progress.hide()
+        status_layout.addWidget(self.busy_progress)
+        
         self.refresh_button = QPushButton("刷新状态")
         self.refresh_button.clicked.connect(self.check_service_status)
         status_layout.addWidget(self.refresh_button)
@@ -1113,8 +1896,10 @@ class MainWindow(QMainWindow):
         log_group = QGroupBox("服务日志")
         log_layout = QVBoxLayout()
         
-        self.log_text = QTextEdit()
+        # 日志只追加纯文本，QPlainTextEdit比QTextEdit快得多，并限制保留的行数
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(LOG_MAX_BLOCKS)
         log_layout.addWidget(self.log_text)
         
         log_controls_layout = QHBoxLayout()
@@ -1128,7 +1913,7 @@ class MainWindow(QMainWindow):
         log_controls_layout.addWidget(clear_log_button)
         
         refresh_log_button = QPushButton("刷新日志")
-        refresh_log_button.clicked.connect(self.refresh_logs)
+        refresh_log_button.clicked.connect(self.reload_logs)
         log_controls_layout.addWidget(refresh_log_button)
         
         log_layout.addLayout(log_controls_layout)
@@ -1206,20 +1991,7 @@ class MainWindow(QMainWindow):
         about_tab = QWidget()
         about_layout = QVBoxLayout(about_tab)
         
-        about_text = f"""
-        <h2>{APP_NAME} v{APP_VERSION}</h2>
-        <p>开发者：{APP_AUTHOR}</p>
-        <p>这是一个用于Windows平台的OpenHands部署助手，可以帮助您快速设置OpenHands运行环境。</p>
-        <p>特性：</p>
-        <ul>
-            <li>自动检查系统兼容性</li>
-            <li>安装配置Docker环境</li>
-            <li>管理OpenHands容器</li>
-            <li>提供简单易用的Web界面接入</li>
-        </ul>
-        """
-        
-        about_label = QLabel(about_text)
+        about_label = QLabel(_ABOUT_HTML)
         about_label.setWordWrap(True)
         about_label.setTextFormat(Qt.RichText)
         about_label.setAlignment(Qt.AlignCenter)
@@ -1239,17 +2011,12 @@ class MainWindow(QMainWindow):
     def setup_tray(self):
         """初始化系统托盘图标"""
         self.tray_icon = QSystemTrayIcon(self)
+        # 平台能力在运行期间不会变化，只查询一次
+        self._tray_messages_supported = (QSystemTrayIcon.supportsMessages()
+                                         and QSystemTrayIcon.isSystemTrayAvailable())
         
-        # # 使用系统图标
-        # self.tray_icon.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
-        # 使用polly.ico作为托盘图标
-        logo_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "polly.ico")
-        if os.path.exists(logo_path):
-            app_icon = QIcon(logo_path)
-            self.tray_icon.setIcon(app_icon)
-        else:
-            # 如果找不到logo文件，使用系统默认图标
-            self.tray_icon.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
+        # 使用polly.ico作为托盘图标，找不到时使用系统默认图标
+        self.tray_icon.setIcon(_tray_icon())
         
         # 创建托盘菜单
         tray_menu = QMenu()
@@ -1305,12 +2072,14 @@ class MainWindow(QMainWindow):
         if self.config.get_setting("minimize_to_tray") and self.tray_icon.isVisible():
             event.ignore()
             self.hide()
-            self.tray_icon.showMessage(
-                APP_NAME,
-                "应用已最小化到系统托盘，点击托盘图标可以恢复。",
-                QSystemTrayIcon.Information,
-                2000
-            )
+            # 平台不支持托盘通知时跳过，避免无效的通知调用
+            if self._tray_messages_supported:
+                self.tray_icon.showMessage(
+                    APP_NAME,
+                    "应用已最小化到系统托盘，点击托盘图标可以恢复。",
+                    QSystemTrayIcon.Information,
+                    2000
+                )
         else:
             event.accept()
     
@@ -1329,6 +2098,11 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.No:
                 return
         
+        self.docker_manager.stop_event_watcher()
+        if self._events_thread is not None:
+            self._events_thread.stop()
+            self._events_thread.wait(1000)
+        self.stop_log_reader(wait=True)
         QApplication.quit()
     
     def check_service_status(self):
@@ -1341,13 +2115,40 @@ class MainWindow(QMainWindow):
             # 设置红色图标
             self.status_icon_label.setText("⚠️")
             self.is_service_running = False
-            self.update_control_buttons()
+            self.update_control_buttons(False)
             self.refresh_button.setEnabled(True)
             return
         
+        # 确保容器事件监听在运行，之后的状态变化由事件推送
+        self.start_event_watcher()
+        
         # 检查OpenHands容器状态
         is_running, status = self.docker_manager.get_container_status()
-        self.is_service_running = is_running and "Up" in status
+        self.apply_container_status(is_running, status)
+        self.refresh_button.setEnabled(True)
+    
+    def start_event_watcher(self):
+        """监听容器事件：优先使用Docker SDK，不可用时使用docker events命令"""
+        if self.docker_manager.start_event_watcher():
+            return
+        if self._events_thread is None or not self._events_thread.isRunning():
+            self._events_thread = DockerEventsThread(self.logger)
+            self._events_thread.state_changed.connect(self._on_docker_event)
+            self._events_thread.start()
+    
+    def _on_docker_event(self, event):
+        """根据docker events推送的事件更新界面，无需再查询容器状态"""
+        self.logger.info(f"OpenHands容器事件: {event}")
+        if event == "destroy":
+            self.apply_container_status(False, "未运行")
+        elif event in ("start", "unpause"):
+            self.apply_container_status(True, "running")
+        else:
+            self.apply_container_status(True, event)
+    
+    def apply_container_status(self, is_running, status):
+        """根据容器状态更新界面"""
+        self.is_service_running = is_running and self.docker_manager.is_running_status(status)
         
         if self.is_service_running:
             self.status_text_label.setText(f"OpenHands服务正在运行: {status}")
@@ -1356,43 +2157,67 @@ class MainWindow(QMainWindow):
             self.status_text_label.setText(f"OpenHands服务未运行: {status}")
             self.status_icon_label.setText("❌")
         
-        self.update_control_buttons()
+        # 能获取到容器状态说明Docker服务正在运行
+        self.update_control_buttons(True)
         self.refresh_logs()
-        self.refresh_button.setEnabled(True)
     
-    def update_control_buttons(self):
-        """更新控制按钮状态"""
-        docker_running = self.system_checker.is_docker_running()
-        
+    def update_control_buttons(self, docker_running):
+        """根据已知的Docker运行状态更新控制按钮"""
+        if self._service_worker is not None:
+            # 服务操作进行中，保持按钮禁用直到操作结束
+            return
         self.start_button.setEnabled(docker_running and not self.is_service_running)
         self.stop_button.setEnabled(self.is_service_running)
         self.restart_button.setEnabled(self.is_service_running)
     
+    def _run_service_task(self, fn, on_done):
+        """在线程池中执行服务操作，期间禁用控制按钮并显示忙碌指示"""
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(False)
+        self.restart_button.setEnabled(False)
+        self.busy_progress.show()
+        
+        self._service_worker = Worker(fn, self.compose_file)
+        self._service_worker.signals.result.connect(on_done)
+        self._service_worker.signals.error.connect(lambda message: on_done((False, message)))
+        self._pool.start(self._service_worker)
+    
+    def _service_task_finished(self):
+        """服务操作结束后隐藏忙碌指示并刷新状态"""
+        self._service_worker = None
+        self.busy_progress.hide()
+        self.check_service_status()
+    
     def start_service(self):
         """启动OpenHands服务"""
-        if not self.compose_file or not os.path.exists(self.compose_file):
+        if self._service_worker is not None:
+            # 已有服务操作在进行（托盘菜单或自动启动也会调用这里），不重复执行
+            return
+        if not self._compose_file_ok:
             QMessageBox.warning(self, "配置错误", "找不到docker-compose配置文件，请重新运行安装向导")
             return
         
-        self.start_button.setEnabled(False)
-        self.log_text.append("正在启动OpenHands服务...\n")
-        
-        # 启动服务
-        success, output = self.docker_manager.start_openhands(self.compose_file)
+        self._append_log("正在启动OpenHands服务...\n")
+        self._run_service_task(self.docker_manager.start_openhands, self._on_start_done)
+    
+    def _on_start_done(self, result):
+        """启动服务完成处理"""
+        success, output = result
+        self._service_task_finished()
         
         if success:
-            self.log_text.append("OpenHands服务启动成功\n")
+            self._append_log("OpenHands服务启动成功\n")
             QMessageBox.information(self, "启动成功", "OpenHands服务已成功启动")
         else:
-            self.log_text.append(f"OpenHands服务启动失败:\n{output}\n")
+            self._append_log(f"OpenHands服务启动失败:\n{output}\n")
             QMessageBox.critical(self, "启动失败", f"OpenHands服务启动失败，请查看日志了解详情")
-        
-        # 更新状态
-        self.check_service_status()
     
     def stop_service(self):
         """停止OpenHands服务"""
-        if not self.compose_file or not os.path.exists(self.compose_file):
+        if self._service_worker is not None:
+            # 已有服务操作在进行（托盘菜单或自动启动也会调用这里），不重复执行
+            return
+        if not self._compose_file_ok:
             QMessageBox.warning(self, "配置错误", "找不到docker-compose配置文件，请重新运行安装向导")
             return
         
@@ -1407,24 +2232,26 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.No:
             return
             
-        self.stop_button.setEnabled(False)
-        self.log_text.append("正在停止OpenHands服务...\n")
-        
-        # 停止服务
-        success, output = self.docker_manager.stop_openhands(self.compose_file)
+        self._append_log("正在停止OpenHands服务...\n")
+        self._run_service_task(self.docker_manager.stop_openhands, self._on_stop_done)
+    
+    def _on_stop_done(self, result):
+        """停止服务完成处理"""
+        success, output = result
+        self._service_task_finished()
         
         if success:
-            self.log_text.append("OpenHands服务已停止\n")
+            self._append_log("OpenHands服务已停止\n")
         else:
-            self.log_text.append(f"停止OpenHands服务失败:\n{output}\n")
+            self._append_log(f"停止OpenHands服务失败:\n{output}\n")
             QMessageBox.critical(self, "停止失败", f"停止OpenHands服务失败，请查看日志了解详情")
-        
-        # 更新状态
-        self.check_service_status()
     
     def restart_service(self):
         """重启OpenHands服务"""
-        if not self.compose_file or not os.path.exists(self.compose_file):
+        if self._service_worker is not None:
+            # 已有服务操作在进行（托盘菜单或自动启动也会调用这里），不重复执行
+            return
+        if not self._compose_file_ok:
             QMessageBox.warning(self, "配置错误", "找不到docker-compose配置文件，请重新运行安装向导")
             return
         
@@ -1439,27 +2266,19 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.No:
             return
             
-        self.restart_button.setEnabled(False)
-        self.log_text.append("正在重启OpenHands服务...\n")
+        self._append_log("正在重启OpenHands服务...\n")
+        self._run_service_task(self.docker_manager.restart_openhands, self._on_restart_done)
+    
+    def _on_restart_done(self, result):
+        """重启服务完成处理"""
+        success, output = result
+        self._service_task_finished()
         
-        # 首先停止服务
-        success, output = self.docker_manager.stop_openhands(self.compose_file)
-        if not success:
-            self.log_text.append(f"停止OpenHands服务失败:\n{output}\n")
-            QMessageBox.critical(self, "重启失败", f"停止OpenHands服务失败，无法完成重启")
-            self.check_service_status()
-            return
-            
-        # 然后启动服务
-        success, output = self.docker_manager.start_openhands(self.compose_file)
         if success:
-            self.log_text.append("OpenHands服务重启成功\n")
+            self._append_log("OpenHands服务重启成功\n")
         else:
-            self.log_text.append(f"启动OpenHands服务失败:\n{output}\n")
-            QMessageBox.critical(self, "重启失败", f"启动OpenHands服务失败，请查看日志了解详情")
-        
-        # 更新状态
-        self.check_service_status()
+            self._append_log(f"OpenHands服务重启失败:\n{output}\n")
+            QMessageBox.critical(self, "重启失败", f"OpenHands服务重启失败，请查看日志了解详情")
     
     def open_in_browser(self):
         """在浏览器中打开OpenHands Web界面"""
@@ -1472,38 +2291,49 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "打开浏览器失败", f"无法打开浏览器: {str(e)}")
     
     def refresh_logs(self):
-        """刷新日志输出"""
+        """根据服务状态启动或停止日志读取"""
         if not self.is_service_running:
+            self.stop_log_reader()
             return
-            
-        try:
-            # 获取容器日志 - FIX: Add utf-8 encoding
-            process = subprocess.Popen(
-                ["docker", "logs", "openhands-app", "--tail", "50"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding='utf-8',  # Add explicit UTF-8 encoding
-                errors='replace'   # Replace characters that can't be decoded
-            )
-            
-            stdout, stderr = process.communicate()
-            
-            if process.returncode == 0:
-                combined_logs = stdout + stderr
-                self.log_text.setText(combined_logs)
-                
-                if self.auto_scroll_check.isChecked():
-                    # 滚动到底部
-                    cursor = self.log_text.textCursor()
-                    cursor.movePosition(QTextCursor.End)
-                    self.log_text.setTextCursor(cursor)
-        except Exception as e:
-            self.log_text.append(f"获取日志失败: {str(e)}\n")
+        
+        if self.log_reader is None or not self.log_reader.isRunning():
+            # 持续读取容器日志，新日志逐行追加
+            self.log_reader = LogReaderThread(self.docker_manager, self)
+            self.log_reader.line_ready.connect(self._append_log)
+            self.log_reader.finished.connect(self._on_log_reader_finished)
+            self.log_reader.start()
+    
+    def _on_log_reader_finished(self):
+        """日志读取线程结束后释放线程对象，当前线程结束时清除引用，下次刷新时重新启动"""
+        reader = self.sender()
+        if reader is self.log_reader:
+            self.log_reader = None
+        reader.deleteLater()
+    
+    def reload_logs(self):
+        """清空并重新读取日志"""
+        self.stop_log_reader()
+        self.log_text.clear()
+        self.refresh_logs()
+    
+    def stop_log_reader(self, wait=False):
+        """停止日志读取"""
+        if self.log_reader is not None:
+            self.log_reader.stop()
+            if wait:
+                self.log_reader.wait(1000)
+            self.log_reader = None
+    
+    def _append_log(self, text):
+        """向日志窗口追加纯文本，按需滚动到底部"""
+        self.log_text.appendPlainText(text)
+        if self.auto_scroll_check.isChecked():
+            # 滚动到底部
+            self.log_text.moveCursor(QTextCursor.End)
     
     def browse_directory(self, line_edit):
         """浏览并选择目录"""
-        directory = QFileDialog.getExistingDirectory(self, "选择目录", line_edit.text())
+        directory = QFileDialog.getExistingDirectory(self, "选择目录", line_edit.text(), BROWSE_DIR_OPTIONS)
         if directory:
             line_edit.setText(directory)
     
@@ -1527,27 +2357,46 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "无效端口", "端口号必须是数字")
             return
         
+        settings = {
+            "workspace_dir": workspace_dir,
+            "state_dir": state_dir,
+            "port": port,
+            "auto_start": auto_start,
+            "minimize_to_tray": minimize_to_tray,
+            "check_update": check_update,
+        }
+        
+        # 记录修改前影响docker-compose文件的设置
+        old_compose_settings = {key: self.config.get_setting(key) for key in DockerManager.COMPOSE_AFFECTING_KEYS}
+        compose_changed = any(settings[key] != old_compose_settings[key] for key in DockerManager.COMPOSE_AFFECTING_KEYS)
+        
+        # 目录设置有变化时确保目录存在
+        try:
+            if workspace_dir != old_compose_settings["workspace_dir"]:
+                os.makedirs(workspace_dir, exist_ok=True)
+            if state_dir != old_compose_settings["state_dir"]:
+                os.makedirs(state_dir, exist_ok=True)
+        except Exception as e:
+            QMessageBox.warning(self, "目录创建失败", f"无法创建目录: {str(e)}")
+            return
+        
         # 保存设置
-        self.config.update_setting("workspace_dir", workspace_dir)
-        self.config.update_setting("state_dir", state_dir)
-        self.config.update_setting("port", port)
-        self.config.update_setting("auto_start", auto_start)
-        self.config.update_setting("minimize_to_tray", minimize_to_tray)
-        self.config.update_setting("check_update", check_update)
-        
-        # 重新生成docker-compose文件
+        with self.config.batch():
+            self.config.update_settings(settings)
+        
+        # 只在相关设置变化或文件缺失时重新生成docker-compose文件
         compose_file = self.config.get_setting("compose_file")
-        if compose_file:
+        if compose_file and (compose_changed or not self._compose_file_ok):
             success = self.docker_manager.generate_compose_file(self.config, compose_file)
+            self._compose_file_ok = success
             if not success:
                 QMessageBox.warning(self, "配置更新失败", "无法更新docker-compose配置文件")
                 return
         
-        # 设置开机自启
-        if auto_start:
-            self.setup_autostart(True)
-        else:
-            self.setup_autostart(False)
+        # 设置开机自启，只在设置变化时在后台创建或删除快捷方式
+        if auto_start != self._last_auto_start:
+            self._last_auto_start = auto_start
+            self._pool.start(Worker(self.setup_autostart, auto_start))
         
         # 更新托盘图标显示
         if minimize_to_tray:
@@ -1558,12 +2407,9 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "设置已保存", "设置已成功保存。\n\n如果修改了端口或路径设置，需要重启OpenHands服务才能生效。")
     
     def setup_autostart(self, enable):
-        """设置开机自启动"""
+        """设置开机自启动，在线程池中执行"""
         # 对于Windows系统，创建或删除启动文件夹中的快捷方式
         try:
-            import winreg
-            import win32com.client
-            
             # 获取当前可执行文件路径
             app_path = sys.executable
             
@@ -1576,13 +2422,22 @@ class MainWindow(QMainWindow):
             shortcut_path = os.path.join(startup_folder, f"{APP_NAME}.lnk")
             
             if enable:
-                # 创建快捷方式
-                shell = win32com.client.Dispatch("WScript.Shell")
-                shortcut = shell.CreateShortCut(shortcut_path)
-                shortcut.TargetPath = app_path
-                shortcut.WorkingDirectory = os.path.dirname(app_path)
-                shortcut.Description = f"启动 {APP_NAME}"
-                shortcut.Save()
+                if win32com is None:
+                    self.logger.warning("未安装pywin32，无法创建开机自启动快捷方式")
+                    return
+                
+                # 后台线程中使用COM需要先初始化
+                pythoncom.CoInitialize()
+                try:
+                    # 创建快捷方式
+                    shell = win32com.client.Dispatch("WScript.Shell")
+                    shortcut = shell.CreateShortCut(shortcut_path)
+                    shortcut.TargetPath = app_path
+                    shortcut.WorkingDirectory = os.path.dirname(app_path)
+                    shortcut.Description = f"启动 {APP_NAME}"
+                    shortcut.Save()
+                finally:
+                    pythoncom.CoUninitialize()
                 self.logger.info(f"已创建开机自启动快捷方式: {shortcut_path}")
             else:
                 # 删除快捷方式
@@ -1603,7 +2458,7 @@ class MainWindow(QMainWindow):
         )
         
         # 更新最后检查时间
-        self.config.update_setting("last_check", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.config.update_setting("last_check", datetime.now().isoformat(sep=" ", timespec="seconds"))
         
 def main():
     """程序入口函数"""
@@ -1612,7 +2467,7 @@ def main():
     app.setQuitOnLastWindowClosed(False)  # 关闭窗口不退出应用
     
     # 初始化配置
-    config = AppConfig()
+    config = get_app_config()
     
     # 初始化日志
     logger = Logger()
@@ -1,73 +1,165 @@
 import os
 import sys
+import glob
+import shlex
 import shutil
-from PyInstaller.__main__ import run
+import subprocess
+import threading
+from pathlib import Path
+
+# 脚本所在目录，所有路径都相对于它
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # 应用信息
 APP_NAME = "OpenHands PC部署助手"
-ICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "polly.ico")
-MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "OpenHandsStarter.py")
+ICON_PATH = os.path.join(SCRIPT_DIR, "polly.ico")
+MAIN_SCRIPT = os.path.join(SCRIPT_DIR, "OpenHandsStarter.py")
 
-# 确保图标文件存在
-if not os.path.exists(ICON_PATH):
-    print(f"错误: 找不到图标文件 {ICON_PATH}")
-    sys.exit(1)
+def _fast_rmtree(path):
+    """自底向上遍历并直接删除文件和目录，不经过shutil.rmtree的逐项检查和onerror处理"""
+    for root, dirs, files in os.walk(path, topdown=False):
+        for name in files:
+            os.unlink(os.path.join(root, name))
+        for name in dirs:
+            dir_path = os.path.join(root, name)
+            # os.walk不进入指向目录的符号链接，只删除链接本身
+            if os.path.islink(dir_path):
+                os.unlink(dir_path)
+            else:
+                os.rmdir(dir_path)
+    os.rmdir(path)
 
-# 清理之前的构建
-dist_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dist")
-build_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build")
-spec_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "OpenHandsStarter.spec")
+def _remove_tree(path):
+    """删除目录；Windows上交给原生的rd /s /q一次完成，其他平台使用_fast_rmtree"""
+    if os.name == 'nt':
+        subprocess.run(['cmd', '/c', 'rd', '/s', '/q', path], check=False)
+        # rd失败时（如文件被占用）用Python方式再试一次，以便报告具体错误
+        if os.path.exists(path):
+            _fast_rmtree(path)
+    else:
+        _fast_rmtree(path)
 
-for path in [dist_dir, build_dir]:
-    if os.path.exists(path):
-        print(f"清理 {path}")
-        shutil.rmtree(path)
+# 在清理和构建之前确保输入文件都存在
+for required_path, description in ((ICON_PATH, "图标文件"), (MAIN_SCRIPT, "主程序")):
+    if not os.path.exists(required_path):
+        print(f"错误: 找不到{description} {required_path}")
+        sys.exit(1)
 
-if os.path.exists(spec_file):
-    os.remove(spec_file)
+# 清理之前的构建
+dist_dir = os.path.join(SCRIPT_DIR, "dist")
+# 中间文件目录：可通过环境变量PYI_WORKPATH指向内存盘（如tmpfs或ImDisk），默认使用脚本目录下的build
+build_dir = os.environ.get("PYI_WORKPATH") or os.path.join(SCRIPT_DIR, "build")
+spec_file = os.path.join(SCRIPT_DIR, "OpenHandsStarter.spec")
+
+# 只清理输出目录；build目录保留PyInstaller的分析缓存，供增量构建复用
+# 先把旧的dist改名，再在后台线程中删除，与PyInstaller构建同时进行
+cleanup_thread = None
+# 清除以前后台删除失败而残留的旧dist目录（尽力而为，失败时留待下次）
+for leftover_dir in glob.glob(f"{glob.escape(dist_dir)}.old.*"):
+    try:
+        _remove_tree(leftover_dir)
+    except OSError as e:
+        print(f"无法清理残留目录 {leftover_dir}: {e}")
+if os.path.exists(dist_dir):
+    old_dist_dir = f"{dist_dir}.old.{os.getpid()}"
+    print(f"清理 {dist_dir}")
+    try:
+        os.rename(dist_dir, old_dist_dir)
+    except OSError:
+        # 改名失败（如目录中的文件正被占用）时直接同步删除
+        _remove_tree(dist_dir)
+    else:
+        # 非守护线程，脚本提前退出时也会等待删除完成
+        cleanup_thread = threading.Thread(target=_remove_tree, args=(old_dist_dir,))
+        cleanup_thread.start()
 
-print(f"开始打包 {APP_NAME} 为单文件可执行程序...")
+print(f"开始打包 {APP_NAME} 为目录形式的可执行程序...")
 
-# PyInstaller 参数 - 使用 --onefile 选项生成单一 EXE 文件
+# PyInstaller 参数 - 使用 --onedir 选项，避免每次启动都解压到临时目录
+# 目录模式下文件已在磁盘上，无需 --runtime-tmpdir；若改回 --onefile，应指向固定的用户目录（如 %LOCALAPPDATA%\OpenHandsStarter）
 pyinstaller_args = [
     MAIN_SCRIPT,
     '--name=OpenHandsStarter',
+    f'--specpath={SCRIPT_DIR}',  # spec文件保存在脚本目录，供下次构建复用
+    f'--workpath={build_dir}',  # 固定中间文件目录，使缓存与当前工作目录无关，可放在内存盘上
+    f'--distpath={dist_dir}',  # 输出到脚本目录下的dist，与下面的检查路径一致
     f'--icon={ICON_PATH}',
-    '--onefile',  # 生成单一 EXE 文件
+    '--onedir',  # 生成包含 EXE 和依赖文件的目录
     '--windowed',  # 使用 GUI 模式，不显示控制台
     '--noconfirm',  # 不询问是否覆盖
-    '--clean',  # 清理旧的构建文件
+    '--noupx',  # 不使用UPX压缩，避免启动时解压和杀毒软件扫描造成的卡顿
+    '--optimize=2',  # 以-OO级别编译收集的模块并以该级别运行，去掉assert和文档字符串
     '--add-data', f'{ICON_PATH};.',  # 将图标文件添加到打包中
     '--hidden-import=PyQt5',
     '--hidden-import=requests',
-    '--hidden-import=pywin32',  # 如果使用了 win32com 组件
 ]
 
-print("使用以下参数运行 PyInstaller:")
-print(' '.join(pyinstaller_args))
+# 排除程序用不到的标准库和Qt模块，减小打包体积
+EXCLUDED_MODULES = [
+    'tkinter',
+    'unittest',
+    'test',
+    'distutils',
+    'pydoc_data',
+    'PyQt5.QtQml',
+    'PyQt5.QtWebEngineCore',
+    'PyQt5.QtWebEngineWidgets',
+    'PyQt5.QtMultimedia',
+]
+pyinstaller_args += [f'--exclude-module={module}' for module in EXCLUDED_MODULES]
+
+# 说明UPX使用情况，避免构建结果依赖于PATH中是否存在upx
+if shutil.which("upx"):
+    print("检测到UPX，但已通过 --noupx 禁用UPX压缩")
+else:
+    print("未使用UPX压缩")
+
+# spec文件比主程序和本脚本都新时直接使用它，PyInstaller可复用build目录中缓存的分析结果
+if (os.path.exists(spec_file)
+        and os.path.getmtime(spec_file) > max(os.path.getmtime(MAIN_SCRIPT), os.path.getmtime(__file__))):
+    print(f"使用已有的spec文件: {spec_file}")
+    # spec文件不记录输出和中间文件目录，需要重新指定
+    pyinstaller_args = [spec_file, '--noconfirm', f'--workpath={build_dir}', f'--distpath={dist_dir}']
 
-# 运行 PyInstaller
-run(pyinstaller_args)
+# 仅在指定 --verbose 时输出可直接复制运行的完整参数
+if '--verbose' in sys.argv:
+    print("使用以下参数运行 PyInstaller:")
+    print(shlex.join(pyinstaller_args))
+
+# 在子进程中运行 PyInstaller，本脚本无需导入PyInstaller，构建失败时直接退出
+result = subprocess.run([sys.executable, '-m', 'PyInstaller', *pyinstaller_args])
+if result.returncode != 0:
+    print(f"PyInstaller 运行失败，返回码: {result.returncode}")
+    sys.exit(result.returncode)
 
 # 检查是否成功
-exe_path = os.path.join(dist_dir, "OpenHandsStarter.exe")
+app_dir = os.path.join(dist_dir, "OpenHandsStarter")
+exe_path = os.path.join(app_dir, "OpenHandsStarter.exe")
 if os.path.exists(exe_path):
     print(f"打包成功！可执行文件位于: {exe_path}")
     
     # 创建一个简单的批处理文件以便快速启动应用
-    bat_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "启动OpenHands部署助手.bat")
-    with open(bat_path, "w") as f:
-        f.write(f'start "" "{exe_path}"\n')
-    
-    print(f"批处理启动文件已创建: {bat_path}")
+    bat_path = os.path.join(SCRIPT_DIR, "启动OpenHands部署助手.bat")
+    # cmd.exe按系统ANSI代码页读取批处理文件，使用mbcs编码以正确处理中文路径
+    bat_encoding = 'mbcs' if os.name == 'nt' else 'utf-8'
+    bat_content = f'@echo off\r\nstart "" "{exe_path}"\r\n'.encode(bat_encoding)
+    bat_file = Path(bat_path)
+    # 内容没有变化时不重写文件
+    if bat_file.exists() and bat_file.read_bytes() == bat_content:
+        print(f"批处理启动文件未变化: {bat_path}")
+    else:
+        bat_file.write_bytes(bat_content)
+        print(f"批处理启动文件已创建: {bat_path}")
     print(f"\n您可以通过运行 {exe_path} 来启动应用")
     
-    # 将可执行文件复制到更明确的名称
-    final_exe_path = os.path.join(dist_dir, f"{APP_NAME}.exe")
-    shutil.copy(exe_path, final_exe_path)
-    print(f"已复制可执行文件为: {final_exe_path}")
+    # 将整个程序目录打包为zip，便于分发
+    zip_path = shutil.make_archive(os.path.join(dist_dir, APP_NAME), "zip", dist_dir, "OpenHandsStarter")
+    print(f"已生成分发压缩包: {zip_path}")
 else:
     print("打包失败，未找到生成的可执行文件。")
     sys.exit(1)
 
-print("\n注意: 使用单文件模式打包会导致应用启动时间变长，因为需要先解压文件到临时目录。")
\ No newline at end of file
+if cleanup_thread is not None:
+    cleanup_thread.join()
+
+print(f"\n注意: 发布时请分发压缩包或整个 {app_dir} 目录，可执行文件依赖目录中的其他文件。")
\ No newline at end of file